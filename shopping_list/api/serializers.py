@@ -35,7 +35,8 @@ class ShoppingListSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "unpurchased_items", "members"]
 
     def get_unpurchased_items(self, obj):
-        return [
-            {"name": shopping_item.name}
-            for shopping_item in obj.shopping_items.filter(purchased=False)
-        ][:3]
+        unpurchased_items = getattr(obj, "prefetched_unpurchased_items", None)
+        if unpurchased_items is None:
+            unpurchased_items = obj.shopping_items.filter(purchased=False)
+
+        return [{"name": shopping_item.name} for shopping_item in unpurchased_items][:3]
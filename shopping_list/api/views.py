@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from rest_framework import generics
 from shopping_list.api.pagination import LargerResultsSetPagination
 from shopping_list.api.permissions import (
@@ -17,8 +18,17 @@ class ListAddShoppingList(generics.ListCreateAPIView):
         return serializer.save(members=[self.request.user])
 
     def get_queryset(self):
-        return ShoppingList.objects.filter(members=self.request.user).order_by(
-            "-last_interaction"
+        return (
+            ShoppingList.objects.filter(members=self.request.user)
+            .prefetch_related(
+                "members",
+                Prefetch(
+                    "shopping_items",
+                    queryset=ShoppingItem.objects.filter(purchased=False),
+                    to_attr="prefetched_unpurchased_items",
+                ),
+            )
+            .order_by("-last_interaction")
         )
 
 
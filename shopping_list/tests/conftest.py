@@ -1,8 +1,30 @@
+import nplusone.ext.django  # noqa: F401 - imported only to patch the ORM
 import pytest
+from django.test import override_settings
+from django.urls import reverse
+from nplusone.core.profiler import Profiler
 from rest_framework.test import APIClient
 from shopping_list.models import ShoppingItem, ShoppingList, User
 
 
+class RecordingProfiler(Profiler):
+    def __init__(self, messages):
+        super().__init__()
+        self.messages = messages
+
+    def notify(self, message):
+        if not message.match(self.whitelist):
+            self.messages.append(message.message)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _fast_password_hasher():
+    with override_settings(
+        PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+    ):
+        yield
+
+
 @pytest.fixture(scope="session")
 def create_shopping_item():
     def _create_shopping_item(name, user):
@@ -16,14 +38,41 @@ def create_shopping_item():
     return _create_shopping_item
 
 
+@pytest.fixture(scope="session")
+def _seeded_db(django_db_setup, django_db_blocker):
+    # Rows created here are committed once per session; every test still runs
+    # in its own transaction that is rolled back afterwards.
+    with django_db_blocker.unblock():
+        user = User(username="DummyUser", email="dummy@user.com")
+        user.set_unusable_password()
+        shopping_list_creator = User(username="Creator", email="creator@list.com")
+        shopping_list_creator.set_unusable_password()
+        User.objects.bulk_create([user, shopping_list_creator])
+
+
 @pytest.fixture(scope="session")
 def create_user():
-    def _create_user():
-        return User.objects.create_user("DummyUser", "dummy@user.com", "sosecure")
+    def _create_user(username, email):
+        user = User(username=username, email=email)
+        user.set_unusable_password()
+        user.save()
+        return user
 
     return _create_user
 
 
+@pytest.fixture(scope="session")
+def dummy_user(_seeded_db, django_db_blocker):
+    with django_db_blocker.unblock():
+        return User.objects.get(username="DummyUser")
+
+
+@pytest.fixture(scope="session")
+def shopping_list_creator(_seeded_db, django_db_blocker):
+    with django_db_blocker.unblock():
+        return User.objects.get(username="Creator")
+
+
 @pytest.fixture(scope="session")
 def create_authenticated_client():
     def _create_authenticated_client(user):
@@ -34,6 +83,12 @@ def create_authenticated_client():
     return _create_authenticated_client
 
 
+@pytest.fixture(scope="module")
+def authed_client(django_db_blocker, dummy_user, create_authenticated_client):
+    with django_db_blocker.unblock():
+        return dummy_user, create_authenticated_client(dummy_user)
+
+
 @pytest.fixture(scope="session")
 def create_shopping_list():
     def _create_shopping_list(user):
@@ -43,3 +98,21 @@ def create_shopping_list():
         return shopping_list
 
     return _create_shopping_list
+
+
+@pytest.fixture(scope="session")
+def item_detail_url():
+    def _item_detail_url(shopping_item):
+        return reverse(
+            "shopping-item-detail",
+            kwargs={"pk": shopping_item.shopping_list_id, "item_pk": shopping_item.id},
+        )
+
+    return _item_detail_url
+
+
+@pytest.fixture
+def nplusone_messages():
+    messages = []
+    with RecordingProfiler(messages):
+        yield messages
@@ -1,185 +1,242 @@
-from datetime import datetime, timedelta
-from unittest import mock
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
 
 import pytest
 from django.urls import reverse
-from django.utils.timezone import make_aware
+from django.utils import timezone
+from freezegun import freeze_time
 from rest_framework import status
-from shopping_list.models import ShoppingItem, ShoppingList, User
+from rest_framework.renderers import JSONRenderer
+from shopping_list.api.renderers import ORJSONRenderer
+from shopping_list.models import ShoppingItem, ShoppingList
+
+ALL_SHOPPING_LISTS_URL = reverse("all-shopping-lists")
 
 
 @pytest.mark.django_db
-def test_valid_shopping_list_is_created(create_user, create_authenticated_client):
-    url = reverse("all-shopping-lists")
+def test_valid_shopping_list_is_created(authed_client):
     data = {
         "name": "Groceries",
     }
-    client = create_authenticated_client(create_user())
-    response = client.post(url, data, format="json")
+    _, client = authed_client
+    response = client.post(ALL_SHOPPING_LISTS_URL, data)
 
     assert response.status_code == status.HTTP_201_CREATED
     assert ShoppingList.objects.get().name == "Groceries"
 
 
 @pytest.mark.django_db
-def test_shopping_list_name_missing_returns_bad_request(
-    create_user, create_authenticated_client
-):
-    url = reverse("all-shopping-lists")
+def test_shopping_list_name_missing_returns_bad_request(authed_client):
     data = {"something_else": "blahblah"}
 
-    client = create_authenticated_client(create_user())
-    response = client.post(url, data, format="json")
+    _, client = authed_client
+    response = client.post(ALL_SHOPPING_LISTS_URL, data)
 
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
 @pytest.mark.django_db
 def test_client_retrieves_only_shopping_lists_they_are_member_of(
-    create_user, create_authenticated_client, create_shopping_list
+    authed_client, create_user, create_shopping_list
 ):
-    user = create_user()
+    user, client = authed_client
     shopping_list = ShoppingList.objects.create(name="Books")
     shopping_list.members.add(user)
 
-    another_user = User.objects.create_user(
-        "SomeoneElse", "someone@else.com", "something"
-    )
+    another_user = create_user("SomeoneElse", "someone@else.com")
     create_shopping_list(another_user)
 
-    client = create_authenticated_client(user)
-    url = reverse("all-shopping-lists")
-    response = client.get(url)
+    response = client.get(ALL_SHOPPING_LISTS_URL)
 
-    assert len(response.data["results"]) == 1
+    assert response.data["count"] == 1
     assert response.data["results"][0]["name"] == "Books"
 
 
 @pytest.mark.django_db
-def test_correct_order_shopping_lists(create_user, create_authenticated_client):
-    user = create_user()
-    client = create_authenticated_client(user)
+def test_correct_order_shopping_lists(
+    authed_client, django_assert_max_num_queries, nplusone_messages
+):
+    user, client = authed_client
+    now = timezone.now()
 
-    with mock.patch("django.utils.timezone.now") as mock_now:
-        mock_now.return_value = make_aware(datetime.now()) - timedelta(days=1)
+    with freeze_time(now - timedelta(days=1)):
         ShoppingList.objects.create(name="Old").members.add(user)
 
-        mock_now.return_value = make_aware(datetime.now()) - timedelta(days=100)
+    with freeze_time(now - timedelta(days=100)):
         ShoppingList.objects.create(name="Oldest").members.add(user)
 
     ShoppingList.objects.create(name="New").members.add(user)
 
-    url = reverse("all-shopping-lists")
-    response = client.get(url)
+    # Session, user, count and page queries, plus one prefetch each for members
+    # and items.
+    with django_assert_max_num_queries(6):
+        response = client.get(ALL_SHOPPING_LISTS_URL)
 
     assert response.data["results"][0]["name"] == "New"
     assert response.data["results"][1]["name"] == "Old"
     assert response.data["results"][2]["name"] == "Oldest"
+    assert nplusone_messages == []
 
 
 @pytest.mark.django_db
-def test_shopping_list_is_retrieved_by_id(
-    create_user, create_authenticated_client, create_shopping_list
-):
-    user = create_user()
-    client = create_authenticated_client(user)
+def test_shopping_list_is_retrieved_by_id(authed_client, create_shopping_list):
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
 
     url = reverse("shopping-list-detail", args=[shopping_list.id])
 
-    response = client.get(url, format="json")
+    response = client.get(url)
 
     assert response.status_code == status.HTTP_200_OK
     assert response.data["name"] == "Groceries"
 
 
 @pytest.mark.django_db
-def test_max_3_shopping_items_on_shopping_list(
-    create_user, create_authenticated_client, create_shopping_list
-):
-    user = create_user()
-    client = create_authenticated_client(user)
-
+def test_shopping_list_is_rendered_as_json(authed_client, create_shopping_list):
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
 
-    ShoppingItem.objects.create(
-        shopping_list=shopping_list, name="Eggs", purchased=False
-    )
-    ShoppingItem.objects.create(
-        shopping_list=shopping_list, name="Chocolate", purchased=False
+    url = reverse("shopping-list-detail", args=[shopping_list.id])
+
+    response = client.get(url)
+
+    assert response["Content-Type"] == "application/json"
+    assert response.json() == {
+        "id": str(shopping_list.id),
+        "name": "Groceries",
+        "unpurchased_items": [],
+        "members": [{"id": user.id, "username": "DummyUser"}],
+    }
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"name": "Groceries", "purchased": False, "unpurchased_items": []},
+        {"count": 1, "price": 2.5, "next": None},
+        {0: ["This field is required."], 1: {}},
+        {"count": 2**70},
+        {"created": datetime(2022, 6, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc)},
+        {"name": "Milk\u2028and\u2029eggs"},
+        {
+            "count": 1,
+            "next": None,
+            "previous": None,
+            "results": [{"id": 1, "name": "null", "unpurchased_items": []}],
+        },
+    ],
+)
+def test_orjson_renderer_output_matches_json_renderer(data):
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+@pytest.mark.parametrize("number", [1e16, 1e-7])
+def test_orjson_renderer_exponent_floats_decode_to_same_value(number):
+    data = {"a": number}
+
+    assert json.loads(ORJSONRenderer().render(data)) == json.loads(
+        JSONRenderer().render(data)
     )
-    ShoppingItem.objects.create(
-        shopping_list=shopping_list, name="Milk", purchased=False
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"price": float("nan")},
+        {"next": None, "results": [{"price": float("inf")}]},
+        {"next": None, "price": Decimal("NaN")},
+    ],
+)
+def test_orjson_renderer_rejects_non_finite_numbers(data):
+    with pytest.raises(ValueError):
+        ORJSONRenderer().render(data)
+
+
+def test_orjson_renderer_respects_requested_indent():
+    data = {"name": "Groceries", "members": [{"id": 1}]}
+    media_type = "application/json; indent=4"
+
+    assert ORJSONRenderer().render(data, media_type) == JSONRenderer().render(
+        data, media_type
     )
-    ShoppingItem.objects.create(
-        shopping_list=shopping_list, name="Mango", purchased=False
+
+
+@pytest.mark.django_db
+def test_max_3_shopping_items_on_shopping_list(authed_client, create_shopping_list):
+    user, client = authed_client
+
+    shopping_list = create_shopping_list(user)
+
+    ShoppingItem.objects.bulk_create(
+        [
+            ShoppingItem(shopping_list=shopping_list, name=name, purchased=False)
+            for name in ("Eggs", "Chocolate", "Milk", "Mango")
+        ]
     )
 
     url = reverse("shopping-list-detail", args=[shopping_list.id])
 
-    response = client.get(url, format="json")
+    response = client.get(url)
 
     assert len(response.data["unpurchased_items"]) == 3
 
 
 @pytest.mark.django_db
 def test_all_shopping_items_on_shopping_list_unpurchased(
-    create_user, create_authenticated_client, create_shopping_list
+    authed_client, create_shopping_list
 ):
-    user = create_user()
-    client = create_authenticated_client(user)
+    user, client = authed_client
 
     shopping_list = create_shopping_list(user)
 
-    ShoppingItem.objects.create(
-        shopping_list=shopping_list, name="Eggs", purchased=False
-    )
-    ShoppingItem.objects.create(
-        shopping_list=shopping_list, name="Chocolate", purchased=True
-    )
-    ShoppingItem.objects.create(
-        shopping_list=shopping_list, name="Milk", purchased=False
+    ShoppingItem.objects.bulk_create(
+        [
+            ShoppingItem(shopping_list=shopping_list, name="Eggs", purchased=False),
+            ShoppingItem(shopping_list=shopping_list, name="Chocolate", purchased=True),
+            ShoppingItem(shopping_list=shopping_list, name="Milk", purchased=False),
+        ]
     )
 
     url = reverse("shopping-list-detail", args=[shopping_list.id])
 
-    response = client.get(url, format="json")
+    response = client.get(url)
 
     assert len(response.data["unpurchased_items"]) == 2
 
 
 @pytest.mark.django_db
 def test_admin_can_retrieve_shopping_list(
-    create_user, create_shopping_list, admin_client
+    dummy_user, create_shopping_list, admin_client
 ):
 
-    user = create_user()
-    shopping_list = create_shopping_list(user)
+    shopping_list = create_shopping_list(dummy_user)
 
     url = reverse("shopping-list-detail", args=[shopping_list.id])
 
-    response = admin_client.get(url, format="json")
+    response = admin_client.get(url)
 
     assert response.status_code == status.HTTP_200_OK
 
 
 @pytest.mark.django_db
-def test_shopping_list_includes_only_corresponding_items(
-    create_user, create_authenticated_client
-):
-    user = create_user()
-    client = create_authenticated_client(user)
+def test_shopping_list_includes_only_corresponding_items(authed_client):
+    user, client = authed_client
 
     shopping_list = ShoppingList.objects.create(name="Groceries")
     shopping_list.members.add(user)
     another_shopping_list = ShoppingList.objects.create(name="Books")
     another_shopping_list.members.add(user)
 
-    ShoppingItem.objects.create(
-        shopping_list=shopping_list, name="Eggs", purchased=False
-    )
-    ShoppingItem.objects.create(
-        shopping_list=another_shopping_list, name="The seven sisters", purchased=False
+    ShoppingItem.objects.bulk_create(
+        [
+            ShoppingItem(shopping_list=shopping_list, name="Eggs", purchased=False),
+            ShoppingItem(
+                shopping_list=another_shopping_list,
+                name="The seven sisters",
+                purchased=False,
+            ),
+        ]
     )
 
     url = reverse("shopping-list-detail", args=[shopping_list.id])
@@ -190,11 +247,8 @@ def test_shopping_list_includes_only_corresponding_items(
 
 
 @pytest.mark.django_db
-def test_shopping_list_name_is_changed(
-    create_user, create_authenticated_client, create_shopping_list
-):
-    user = create_user()
-    client = create_authenticated_client(user)
+def test_shopping_list_name_is_changed(authed_client, create_shopping_list):
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
 
     url = reverse("shopping-list-detail", args=[shopping_list.id])
@@ -203,7 +257,7 @@ def test_shopping_list_name_is_changed(
         "name": "Food",
     }
 
-    response = client.put(url, data=data, format="json")
+    response = client.put(url, data=data)
 
     assert response.status_code == status.HTTP_200_OK
     assert response.data["name"] == "Food"
@@ -211,49 +265,25 @@ def test_shopping_list_name_is_changed(
 
 @pytest.mark.django_db
 def test_shopping_list_not_changed_because_name_missing(
-    create_user, create_authenticated_client, create_shopping_list
+    authed_client, create_shopping_list
 ):
-    user = create_user()
-    client = create_authenticated_client(user)
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
 
     url = reverse("shopping-list-detail", args=[shopping_list.id])
 
     data = {"something_else": "blahblah"}
 
-    response = client.put(url, data=data, format="json")
+    response = client.put(url, data=data)
 
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
-@pytest.mark.django_db
-def test_update_shopping_list_restricted_if_not_member(
-    create_user, create_authenticated_client, create_shopping_list
-):
-    user = create_user()
-    shopping_list_creator = User.objects.create_user(
-        "Creator", "creator@list.com", "something"
-    )
-    client = create_authenticated_client(user)
-    shopping_list = create_shopping_list(shopping_list_creator)
-
-    url = reverse("shopping-list-detail", args=[shopping_list.id])
-
-    data = {
-        "name": "Food",
-    }
-
-    response = client.put(url, data=data, format="json")
-
-    assert response.status_code == status.HTTP_403_FORBIDDEN
-
-
 @pytest.mark.django_db
 def test_shopping_list_name_is_changed_with_partial_update(
-    create_user, create_authenticated_client, create_shopping_list
+    authed_client, create_shopping_list
 ):
-    user = create_user()
-    client = create_authenticated_client(user)
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
     url = reverse("shopping-list-detail", args=[shopping_list.id])
 
@@ -261,7 +291,7 @@ def test_shopping_list_name_is_changed_with_partial_update(
         "name": "Food",
     }
 
-    response = client.patch(url, data=data, format="json")
+    response = client.patch(url, data=data)
 
     assert response.status_code == status.HTTP_200_OK
     assert response.data["name"] == "Food"
@@ -269,49 +299,23 @@ def test_shopping_list_name_is_changed_with_partial_update(
 
 @pytest.mark.django_db
 def test_partial_update_with_missing_name_has_no_impact(
-    create_user, create_authenticated_client, create_shopping_list
+    authed_client, create_shopping_list
 ):
-    user = create_user()
-    client = create_authenticated_client(user)
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
 
     url = reverse("shopping-list-detail", args=[shopping_list.id])
 
     data = {"something_else": "blahblah"}
 
-    response = client.patch(url, data=data, format="json")
+    response = client.patch(url, data=data)
 
     assert response.status_code == status.HTTP_200_OK
 
 
 @pytest.mark.django_db
-def test_partial_update_shopping_list_restricted_if_not_member(
-    create_user, create_authenticated_client, create_shopping_list
-):
-    user = create_user()
-    shopping_list_creator = User.objects.create_user(
-        "Creator", "creator@list.com", "something"
-    )
-    client = create_authenticated_client(user)
-    shopping_list = create_shopping_list(shopping_list_creator)
-
-    url = reverse("shopping-list-detail", args=[shopping_list.id])
-
-    data = {
-        "name": "Food",
-    }
-
-    response = client.patch(url, data=data, format="json")
-
-    assert response.status_code == status.HTTP_403_FORBIDDEN
-
-
-@pytest.mark.django_db
-def test_shopping_list_is_deleted(
-    create_user, create_authenticated_client, create_shopping_list
-):
-    user = create_user()
-    client = create_authenticated_client(user)
+def test_shopping_list_is_deleted(authed_client, create_shopping_list):
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
 
     url = reverse("shopping-list-detail", args=[shopping_list.id])
@@ -319,74 +323,35 @@ def test_shopping_list_is_deleted(
     response = client.delete(url)
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    assert len(ShoppingList.objects.all()) == 0
-
-
-@pytest.mark.django_db
-def test_delete_shopping_list_restricted_if_not_member(
-    create_user, create_authenticated_client, create_shopping_list
-):
-    user = create_user()
-    shopping_list_creator = User.objects.create_user(
-        "Creator", "creator@list.com", "something"
-    )
-    client = create_authenticated_client(user)
-    shopping_list = create_shopping_list(shopping_list_creator)
-
-    url = reverse("shopping-list-detail", args=[shopping_list.id])
-
-    response = client.delete(url, format="json")
-
-    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert ShoppingList.objects.count() == 0
 
 
 @pytest.mark.django_db
 def test_list_shopping_items_is_retrieved_by_shopping_list_member(
-    create_user, create_authenticated_client, create_shopping_list
+    authed_client, create_shopping_list
 ):
-    user = create_user()
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
-    shopping_item_1 = ShoppingItem.objects.create(
-        name="Oranges", purchased=False, shopping_list=shopping_list
-    )
-    shopping_item_2 = ShoppingItem.objects.create(
-        name="Milk", purchased=False, shopping_list=shopping_list
+    shopping_item_1, shopping_item_2 = ShoppingItem.objects.bulk_create(
+        [
+            ShoppingItem(name="Oranges", purchased=False, shopping_list=shopping_list),
+            ShoppingItem(name="Milk", purchased=False, shopping_list=shopping_list),
+        ]
     )
 
-    client = create_authenticated_client(user)
     url = reverse("list-add-shopping-item", kwargs={"pk": shopping_list.id})
     response = client.get(url)
 
-    assert len(response.data["results"]) == 2
+    assert response.data["count"] == 2
     assert response.data["results"][0]["name"] == shopping_item_1.name
     assert response.data["results"][1]["name"] == shopping_item_2.name
 
 
-@pytest.mark.django_db
-def test_not_member_can_not_retrieve_shopping_items(
-    create_user, create_authenticated_client, create_shopping_item
-):
-    shopping_list_creator = User.objects.create_user(
-        "SomeoneElse", "someone@else.com", "something"
-    )
-    shopping_item = create_shopping_item("Milk", shopping_list_creator)
-
-    user = create_user()
-    client = create_authenticated_client(user)
-    url = reverse(
-        "list-add-shopping-item", kwargs={"pk": shopping_item.shopping_list.id}
-    )
-
-    response = client.get(url)
-
-    assert response.status_code == status.HTTP_403_FORBIDDEN
-
-
 @pytest.mark.django_db
 def test_list_shopping_items_only_the_ones_belonging_to_the_same_shopping_list(
-    create_user, create_authenticated_client
+    authed_client,
 ):
-    user = create_user()
+    user, client = authed_client
 
     shopping_list = ShoppingList.objects.create(name="My shopping list")
     shopping_list.members.add(user)
@@ -402,38 +367,33 @@ def test_list_shopping_items_only_the_ones_belonging_to_the_same_shopping_list(
         shopping_list=another_shopping_list,
     )
 
-    client = create_authenticated_client(user)
     url = reverse("list-add-shopping-item", kwargs={"pk": shopping_list.id})
 
     response = client.get(url)
 
-    assert len(response.data["results"]) == 1
+    assert response.data["count"] == 1
     assert response.data["results"][0]["name"] == shopping_item_from_this_list.name
 
 
 @pytest.mark.django_db
-def test_valid_shopping_item_is_created(
-    create_user, create_authenticated_client, create_shopping_list
-):
-    user = create_user()
-    client = create_authenticated_client(user)
+def test_valid_shopping_item_is_created(authed_client, create_shopping_list):
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
 
     url = reverse("list-add-shopping-item", args=[shopping_list.id])
 
     data = {"name": "Milk", "purchased": False}
 
-    response = client.post(url, data, format="json")
+    response = client.post(url, data)
 
     assert response.status_code == status.HTTP_201_CREATED
 
 
 @pytest.mark.django_db
 def test_create_shopping_item_missing_data_returns_bad_request(
-    create_user, create_authenticated_client, create_shopping_list
+    authed_client, create_shopping_list
 ):
-    user = create_user()
-    client = create_authenticated_client(user)
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
 
     url = reverse("list-add-shopping-item", args=[shopping_list.id])
@@ -442,52 +402,28 @@ def test_create_shopping_item_missing_data_returns_bad_request(
         "name": "Milk",
     }
 
-    response = client.post(url, data, format="json")
+    response = client.post(url, data)
 
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
 @pytest.mark.django_db
-def test_not_member_of_list_can_not_add_shopping_item(
-    create_user, create_authenticated_client, create_shopping_list
-):
-    user = create_user()
-    client = create_authenticated_client(user)
-    shopping_list_creator = User.objects.create_user(
-        "Creator", "creator@list.com", "something"
-    )
-    shopping_list = create_shopping_list(shopping_list_creator)
-
-    url = reverse("list-add-shopping-item", args=[shopping_list.id])
-
-    data = {"name": "Milk", "purchased": False}
-
-    response = client.post(url, data, format="json")
-
-    assert response.status_code == status.HTTP_403_FORBIDDEN
-
-
-@pytest.mark.django_db
-def test_admin_can_add_shopping_items(create_user, create_shopping_list, admin_client):
-    user = create_user()
-    shopping_list = create_shopping_list(user)
+def test_admin_can_add_shopping_items(dummy_user, create_shopping_list, admin_client):
+    shopping_list = create_shopping_list(dummy_user)
 
     url = reverse("list-add-shopping-item", kwargs={"pk": shopping_list.id})
 
     data = {"name": "Milk", "purchased": False}
 
-    response = admin_client.post(url, data, format="json")
+    response = admin_client.post(url, data)
 
     assert response.status_code == status.HTTP_201_CREATED
 
 
 @pytest.mark.django_db
-def test_duplicate_item_on_list_bad_request(
-    create_user, create_authenticated_client, create_shopping_list
-):
+def test_duplicate_item_on_list_bad_request(authed_client, create_shopping_list):
 
-    user = create_user()
-    client = create_authenticated_client(user)
+    user, client = authed_client
     shopping_list = create_shopping_list(user)
     ShoppingItem.objects.create(
         shopping_list=shopping_list, name="Milk", purchased=False
@@ -497,24 +433,20 @@ def test_duplicate_item_on_list_bad_request(
 
     data = {"name": "Milk", "purchased": False}
 
-    response = client.post(url, data, format="json")
+    response = client.post(url, data)
 
     assert response.status_code == status.HTTP_400_BAD_REQUEST
-    assert len(shopping_list.shopping_items.all()) == 1
+    assert shopping_list.shopping_items.count() == 1
 
 
 @pytest.mark.django_db
 def test_shopping_item_is_retrieved_by_id(
-    create_user, create_authenticated_client, create_shopping_item
+    authed_client, create_shopping_item, item_detail_url
 ):
-    user = create_user()
-    client = create_authenticated_client(user)
+    user, client = authed_client
     shopping_item = create_shopping_item(name="Chocolate", user=user)
 
-    url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": shopping_item.shopping_list.id, "item_pk": shopping_item.id},
-    )
+    url = item_detail_url(shopping_item)
 
     response = client.get(url)
 
@@ -522,38 +454,13 @@ def test_shopping_item_is_retrieved_by_id(
     assert response.data["name"] == "Chocolate"
 
 
-@pytest.mark.django_db
-def test_shopping_item_detail_access_restricted_if_not_member_of_shopping_list(
-    create_user, create_authenticated_client, create_shopping_item
-):
-    user = create_user()
-    shopping_list_creator = User.objects.create_user(
-        "Creator", "creator@list.com", "something"
-    )
-    client = create_authenticated_client(user)
-    shopping_item = create_shopping_item(name="Chocolate", user=shopping_list_creator)
-
-    url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": shopping_item.shopping_list.id, "item_pk": shopping_item.id},
-    )
-
-    response = client.get(url, format="json")
-
-    assert response.status_code == status.HTTP_403_FORBIDDEN
-
-
 @pytest.mark.django_db
 def test_admin_can_retrieve_single_shopping_item(
-    create_user, create_shopping_item, admin_client
+    dummy_user, create_shopping_item, admin_client, item_detail_url
 ):
-    user = create_user()
-    shopping_item = create_shopping_item("Milk", user)
+    shopping_item = create_shopping_item("Milk", dummy_user)
 
-    url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": shopping_item.shopping_list.id, "item_pk": shopping_item.id},
-    )
+    url = item_detail_url(shopping_item)
 
     response = admin_client.get(url)
 
@@ -562,182 +469,152 @@ def test_admin_can_retrieve_single_shopping_item(
 
 @pytest.mark.django_db
 def test_change_shopping_item_purchased_status(
-    create_user, create_authenticated_client, create_shopping_item
+    authed_client, create_shopping_item, item_detail_url
 ):
-    user = create_user()
-    client = create_authenticated_client(user)
+    user, client = authed_client
     shopping_item = create_shopping_item(name="Chocolate", user=user)
 
-    url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": shopping_item.shopping_list.id, "item_pk": shopping_item.id},
-    )
+    url = item_detail_url(shopping_item)
 
     data = {"name": "Chocolate", "purchased": True}
-    response = client.put(url, data, format="json")
+    response = client.put(url, data)
 
     assert response.status_code == status.HTTP_200_OK
-    assert ShoppingItem.objects.get().purchased is True
+    assert response.data["purchased"] is True
 
 
 @pytest.mark.django_db
 def test_change_shopping_item_purchased_status_with_missing_data_returns_bad_request(
-    create_user,
-    create_authenticated_client,
-    create_shopping_item,
+    authed_client, create_shopping_item, item_detail_url
 ):
-    user = create_user()
-    client = create_authenticated_client(user)
+    user, client = authed_client
     shopping_item = create_shopping_item(name="Chocolate", user=user)
 
-    url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": shopping_item.shopping_list.id, "item_pk": shopping_item.id},
-    )
+    url = item_detail_url(shopping_item)
 
     data = {"purchased": True}
-    response = client.put(url, data, format="json")
+    response = client.put(url, data)
 
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
-@pytest.mark.django_db
-def test_shopping_item_update_restricted_if_not_member_of_shopping_list(
-    create_user, create_authenticated_client, create_shopping_item
-):
-    user = create_user()
-    shopping_list_creator = User.objects.create_user(
-        "Creator", "creator@list.com", "something"
-    )
-    client = create_authenticated_client(user)
-    shopping_item = create_shopping_item(name="Chocolate", user=shopping_list_creator)
-
-    url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": shopping_item.shopping_list.id, "item_pk": shopping_item.id},
-    )
-
-    data = {"name": "Chocolate", "purchased": True}
-
-    response = client.put(url, data=data, format="json")
-
-    assert response.status_code == status.HTTP_403_FORBIDDEN
-
-
 @pytest.mark.django_db
 def test_change_shopping_item_purchased_status_with_partial_update(
-    create_user,
-    create_authenticated_client,
-    create_shopping_item,
+    authed_client, create_shopping_item, item_detail_url
 ):
-    user = create_user()
-    client = create_authenticated_client(user)
+    user, client = authed_client
     shopping_item = create_shopping_item(name="Chocolate", user=user)
 
-    url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": shopping_item.shopping_list.id, "item_pk": shopping_item.id},
-    )
+    url = item_detail_url(shopping_item)
 
     data = {"purchased": True}
-    response = client.patch(url, data, format="json")
+    response = client.patch(url, data)
 
     assert response.status_code == status.HTTP_200_OK
-    assert ShoppingItem.objects.get().purchased is True
+    assert response.data["purchased"] is True
 
 
 @pytest.mark.django_db
-def test_shopping_item_partial_update_restricted_if_not_member_of_shopping_list(
-    create_user, create_authenticated_client, create_shopping_item
+def test_shopping_lists_order_changed_when_item_marked_purchased(
+    authed_client, django_assert_max_num_queries, item_detail_url, nplusone_messages
 ):
-    user = create_user()
-    shopping_list_creator = User.objects.create_user(
-        "Creator", "creator@list.com", "something"
-    )
-    client = create_authenticated_client(user)
-    shopping_item = create_shopping_item(name="Chocolate", user=shopping_list_creator)
+    user, client = authed_client
 
-    url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": shopping_item.shopping_list.id, "item_pk": shopping_item.id},
+    now = timezone.now()
+    older_list, recent_list = ShoppingList.objects.bulk_create(
+        [ShoppingList(name="Older"), ShoppingList(name="Recent")]
     )
-
-    data = {"purchased": True}
-
-    response = client.patch(url, data=data, format="json")
-
-    assert response.status_code == status.HTTP_403_FORBIDDEN
-
-
-@pytest.mark.django_db
-def test_shopping_lists_order_changed_when_item_marked_purchased(
-    create_user, create_authenticated_client
-):
-    user = create_user()
-    client = create_authenticated_client(user)
-
-    with mock.patch("django.utils.timezone.now") as mock_now:
-        mock_now.return_value = make_aware(datetime.now()) - timedelta(days=20)
-        older_list = ShoppingList.objects.create(name="Older")
-        older_list.members.add(user)
-        shopping_item_on_older_list = ShoppingItem.objects.create(
-            name="Milk", purchased=False, shopping_list=older_list
-        )
-
-        mock_now.return_value = make_aware(datetime.now()) - timedelta(days=1)
-        ShoppingList.objects.create(name="Recent").members.add(user)
-
-    shopping_item_url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": older_list.id, "item_pk": shopping_item_on_older_list.id},
+    ShoppingList.members.through.objects.bulk_create(
+        [
+            ShoppingList.members.through(shoppinglist=older_list, user=user),
+            ShoppingList.members.through(shoppinglist=recent_list, user=user),
+        ]
+    )
+    shopping_item_on_older_list = ShoppingItem.objects.create(
+        name="Milk", purchased=False, shopping_list=older_list
+    )
+    # auto_now stamps last_interaction on insert, so backdate it afterwards.
+    ShoppingList.objects.filter(pk=older_list.pk).update(
+        last_interaction=now - timedelta(days=20)
     )
-    shopping_lists_url = reverse("all-shopping-lists")
+    ShoppingList.objects.filter(pk=recent_list.pk).update(
+        last_interaction=now - timedelta(days=1)
+    )
+
+    shopping_item_url = item_detail_url(shopping_item_on_older_list)
 
     data = {"purchased": True}
 
     client.patch(shopping_item_url, data)
 
-    response = client.get(shopping_lists_url)
+    with django_assert_max_num_queries(6):
+        response = client.get(ALL_SHOPPING_LISTS_URL)
 
     assert response.data["results"][0]["name"] == "Older"
     assert response.data["results"][1]["name"] == "Recent"
+    assert nplusone_messages == []
 
 
 @pytest.mark.django_db
-def test_shopping_item_is_deleted(
-    create_user, create_authenticated_client, create_shopping_item
-):
-    user = create_user()
-    client = create_authenticated_client(user)
+def test_shopping_item_is_deleted(authed_client, create_shopping_item, item_detail_url):
+    user, client = authed_client
     shopping_item = create_shopping_item(name="Chocolate", user=user)
 
-    url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": shopping_item.shopping_list.id, "item_pk": shopping_item.id},
-    )
+    url = item_detail_url(shopping_item)
 
     response = client.delete(url)
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
-    assert len(ShoppingItem.objects.all()) == 0
+    assert ShoppingItem.objects.count() == 0
 
 
 @pytest.mark.django_db
-def test_shopping_item_delete_restricted_if_not_member_of_shopping_list(
-    create_user, create_authenticated_client, create_shopping_item
+@pytest.mark.parametrize(
+    "method, url_name, data",
+    [
+        ("put", "shopping-list-detail", {"name": "Food"}),
+        ("patch", "shopping-list-detail", {"name": "Food"}),
+        ("delete", "shopping-list-detail", None),
+        ("get", "list-add-shopping-item", None),
+        ("post", "list-add-shopping-item", {"name": "Milk", "purchased": False}),
+    ],
+)
+def test_shopping_list_access_restricted_if_not_member(
+    method, url_name, data, authed_client, create_shopping_list, shopping_list_creator
 ):
-    user = create_user()
-    shopping_list_creator = User.objects.create_user(
-        "Creator", "creator@list.com", "something"
-    )
-    client = create_authenticated_client(user)
+    _, client = authed_client
+    shopping_list = create_shopping_list(shopping_list_creator)
+
+    url = reverse(url_name, args=[shopping_list.id])
+
+    response = getattr(client, method)(url, data)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "method, data",
+    [
+        ("get", None),
+        ("put", {"name": "Chocolate", "purchased": True}),
+        ("patch", {"purchased": True}),
+        ("delete", None),
+    ],
+)
+def test_shopping_item_access_restricted_if_not_member_of_shopping_list(
+    method,
+    data,
+    authed_client,
+    create_shopping_item,
+    shopping_list_creator,
+    item_detail_url,
+):
+    _, client = authed_client
     shopping_item = create_shopping_item(name="Chocolate", user=shopping_list_creator)
 
-    url = reverse(
-        "shopping-item-detail",
-        kwargs={"pk": shopping_item.shopping_list.id, "item_pk": shopping_item.id},
-    )
+    url = item_detail_url(shopping_item)
 
-    response = client.delete(url)
+    response = getattr(client, method)(url, data)
 
     assert response.status_code == status.HTTP_403_FORBIDDEN